@@ -1,73 +1,195 @@
 #!/usr/bin/env python3
 import os
+import sys
 import click
+import itertools
 import subprocess
-import configparser
-import re
-from texttable import Texttable
 
+_git_executable = None
 CONFIG_FILE = os.path.expanduser("~/.gitconfig")
-config = configparser.ConfigParser()
+_ALIAS_INVALID_BYTES = bytes(c for c in range(128) if not chr(c).isalpha())
+_config_cache = None
+COMMIT_PAGE_SIZE = 50
 
-if os.path.exists(CONFIG_FILE):
-    config.read(CONFIG_FILE)
+def _load_config():
+    """Parse CONFIG_FILE on first use, re-reading it only when its mtime changes."""
+    import configparser
+    global _config_cache
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if _config_cache is None or _config_cache[0] != mtime:
+        config = configparser.ConfigParser()
+        if mtime is not None:
+            config.read(CONFIG_FILE, encoding="utf-8")
+        _config_cache = (mtime, config)
+    return _config_cache[1]
+
+def _save_config(config):
+    """Serialize config in memory, write it to a temporary file in one go and rename it over CONFIG_FILE."""
+    import io
+    import tempfile
+    global _config_cache
+    buffer = io.StringIO()
+    config.write(buffer)
+    data = buffer.getvalue().encode("utf-8")
+    # Resolve symlinks so a linked ~/.gitconfig is updated rather than replaced.
+    target = os.path.realpath(CONFIG_FILE)
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(target))
+    try:
+        with os.fdopen(fd, "wb") as config_file:
+            config_file.write(data)
+            config_file.flush()
+            os.fsync(config_file.fileno())
+        if os.path.exists(target):
+            mode = os.stat(target).st_mode
+        else:
+            # mkstemp creates 0600; match what open(..., "w") would have created.
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_file, mode)
+        os.replace(tmp_file, target)
+    except BaseException:
+        os.unlink(tmp_file)
+        raise
+    _config_cache = (os.stat(CONFIG_FILE).st_mtime_ns, config)
+
+def _git():
+    """Resolve the git executable on first use, so PATH is searched once per run."""
+    import shutil
+    global _git_executable
+    if _git_executable is None:
+        _git_executable = shutil.which("git") or "git"
+    return _git_executable
 
 def __run(command, cwd):
+    # command[0] is the resolved executable; show plain "git" to the user.
+    display = " ".join(["git", *command[1:]])
     try:
         result = subprocess.run(command, cwd=cwd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        click.echo(f"'{' '.join(command)}' executed successfully\n{result.stdout}")
+        click.echo(f"'{display}' executed successfully\n{result.stdout}")
         return result
     except subprocess.CalledProcessError as e:
-        click.echo(f"Error running '{' '.join(command)}': {e.stderr}")
+        click.echo(f"Error running '{display}': {e.stderr}")
         return e
 
 def _find_git_folder(path):
-    if not os.path.isdir(path):
-        return None
-    for el in os.listdir(path):
-        el_path = os.path.join(path, el)
-        if os.path.isdir(el_path) and el == ".git":
-            return el_path
-    return None
+    git_path = os.path.join(path, ".git")
+    return git_path if os.path.isdir(git_path) else None
 
 def _get_commit_list(directory):
+    """Yield (short sha, summary) tuples, newest first, as they are read from the history."""
     try:
-        result = __run(["git", "log", "--oneline"], directory)
-        if result.returncode == 0:
-            return result.stdout.strip().split("\n")
-    except subprocess.CalledProcessError as e:
-        click.echo(f"Error retrieving commit list: {e.stderr}")
-    return []
+        import pygit2
+    except ImportError:
+        pygit2 = None
+    if pygit2 is not None:
+        try:
+            repo = pygit2.Repository(directory)
+            walker = repo.walk(repo.head.target, pygit2.GIT_SORT_TIME)
+        except pygit2.GitError as e:
+            click.echo(f"Error retrieving commit list: {e}")
+            return
+        for commit in walker:
+            yield commit.short_id, commit.raw_message.partition(b"\n")[0].decode("utf-8", "replace")
+        return
+    process = subprocess.Popen([_git(), "log", "--format=%h %s"], cwd=directory, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    exhausted = False
+    try:
+        for line in process.stdout:
+            sha, _, summary = line.rstrip(b"\n").partition(b" ")
+            yield sha.decode("ascii"), summary.decode("utf-8", "replace")
+        exhausted = True
+    finally:
+        # Closing stdout early stops git log with a broken pipe instead of letting it finish.
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        if process.wait() != 0 and exhausted:
+            click.echo(f"Error retrieving commit list: {stderr.decode(errors='replace')}")
+
+def _conflicting_commit(directory):
+    try:
+        with open(os.path.join(directory, ".git", "CHERRY_PICK_HEAD")) as head:
+            return head.read().strip()
+    except OSError:
+        return None
+
+def _sequencer_in_progress(directory):
+    return os.path.isdir(os.path.join(directory, ".git", "sequencer"))
+
+def _invalid_revisions(commits, directory):
+    """Return the revisions that do not name a commit, checked in a single git call."""
+    result = subprocess.run([_git(), "cat-file", "--batch-check"], cwd=directory, input="".join(f"{commit}^{{commit}}\n" for commit in commits),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        return []
+    return [commit for commit, line in zip(commits, result.stdout.splitlines()) if line.split()[1:2] != ["commit"]]
 
 def _cherry_pick_commits(commits, target_branch, directory, auto_resolve=False):
     try:
-        __run(["git", "checkout", target_branch], directory)
-        for commit in commits:
-            result = __run(["git", "cherry-pick", commit], directory)
-            if result.returncode != 0:
-                if auto_resolve:
-                    __run(["git", "cherry-pick", "--skip"], directory)
-                    click.echo(f"Automatically skipped commit {commit} due to conflicts.")
+        __run([_git(), "checkout", target_branch], directory)
+        commits = list(commits)
+        invalid = _invalid_revisions(commits, directory)
+        if invalid:
+            if not auto_resolve:
+                click.echo(f"Invalid commit(s) {invalid}. Nothing was cherry-picked.")
+                return
+            click.echo(f"Automatically skipped invalid commit(s) {invalid}.")
+            commits = [commit for commit in commits if commit not in invalid]
+            if not commits:
+                click.echo("No valid commits left to cherry-pick.")
+                return
+        result = __run([_git(), "cherry-pick"] + commits, directory)
+        skipped = None
+        skips = 0
+        while result.returncode != 0:
+            commit = _conflicting_commit(directory)
+            # git can stop before applying a commit (e.g. untracked files would be overwritten)
+            # without writing CHERRY_PICK_HEAD, leaving the rest of the sequence pending.
+            if commit is None and not _sequencer_in_progress(directory):
+                click.echo(f"Cherry-pick onto {target_branch} failed.")
+                break
+            # Give up if --skip made no progress, rather than retrying it forever.
+            if auto_resolve and skips < len(commits) and (commit is None or commit != skipped):
+                skips += 1
+                skipped = commit
+                result = __run([_git(), "cherry-pick", "--skip"], directory)
+                if commit is None:
+                    click.echo("Automatically skipped a commit that could not be applied.")
                 else:
-                    click.echo(f"Conflict detected while cherry-picking commit {commit}. Aborting...")
-                    __run(["git", "cherry-pick", "--abort"], directory)
-                    break
-        click.echo(f"Cherry-picked commits {commits} onto {target_branch} successfully.")
+                    click.echo(f"Automatically skipped commit {commit} due to conflicts.")
+                continue
+            if commit is None:
+                click.echo("Cherry-pick stopped before a commit could be applied. Aborting...")
+            else:
+                click.echo(f"Conflict detected while cherry-picking commit {commit}. Aborting...")
+                # Drop only the conflicting commit; the ones already applied stay, as before.
+                __run([_git(), "reset", "--merge"], directory)
+            __run([_git(), "cherry-pick", "--quit"], directory)
+            break
+        if result.returncode == 0:
+            click.echo(f"Cherry-picked commits {commits} onto {target_branch} successfully.")
     except subprocess.CalledProcessError as e:
         click.echo(f"Error during cherry-pick process: {e.stderr}")
-        __run(["git", "cherry-pick", "--abort"], directory)
+        __run([_git(), "cherry-pick", "--abort"], directory)
         click.echo("Cherry-pick aborted due to conflict.")
 
 def _sanitize_alias(name):
     """Sanitize alias name to remove invalid characters."""
-    reg = re.compile('[^a-zA-Z]')
-    return reg.sub('', name)
+    return name.encode("ascii", "ignore").translate(None, _ALIAS_INVALID_BYTES).decode("ascii")
 
 @click.group()
 @click.option("-p", "--path", default=".", type=str, help="Target path to search")
 @click.pass_context
 def cli(ctx, path):
-    absolute_path = os.path.abspath(path)
+    # Aliases live in ~/.gitconfig and work outside a git project.
+    if ctx.invoked_subcommand and ctx.invoked_subcommand.startswith("alias"):
+        return
+    # abspath() calls getcwd(); normpath() gives the same result for a path that is already absolute.
+    absolute_path = os.path.normpath(path) if os.path.isabs(path) else os.path.abspath(path)
     git_path = _find_git_folder(absolute_path)
     if not git_path:
         click.echo(f"{absolute_path} is not a git project directory")
@@ -85,9 +207,9 @@ def cli(ctx, path):
 def push(ctx, message):
     """Add, commit with message, and push"""
     parent_dir = ctx.obj["parent_dir"]
-    __run(["git", "add", "."], parent_dir)
-    __run(["git", "commit", "-m", message], parent_dir)
-    __run(["git", "push"], parent_dir)
+    __run([_git(), "add", "."], parent_dir)
+    __run([_git(), "commit", "-m", message], parent_dir)
+    __run([_git(), "push"], parent_dir)
 
 @cli.command()
 @click.option("--cherry-pick", multiple=True, type=str, help="Cherry-pick specified commit(s)")
@@ -99,12 +221,19 @@ def cherry_pick(ctx, cherry_pick, branch, auto_resolve, interactive):
     """Interactive cherry-picking"""
     parent_dir = ctx.obj["parent_dir"]
     if interactive:
-        commits = _get_commit_list(parent_dir)
-        for i, commit in enumerate(commits):
-            print(f"{i}: {commit}")
+        commit_iter = _get_commit_list(parent_dir)
+        commits = []
+        while True:
+            page = list(itertools.islice(commit_iter, COMMIT_PAGE_SIZE))
+            sys.stdout.write("".join(f"{i}: {sha} {summary}\n" for i, (sha, summary) in enumerate(page, len(commits))))
+            sys.stdout.flush()
+            commits.extend(page)
+            if len(page) < COMMIT_PAGE_SIZE or not click.confirm("Show more commits?", default=False):
+                break
+        commit_iter.close()
         selected_commits = click.prompt("Enter the numbers of commits to cherry-pick, separated by commas", type=str)
         selected_indices = [int(x) for x in selected_commits.split(",")]
-        cherry_pick = [commits[i].split()[0] for i in selected_indices]
+        cherry_pick = [commits[i][0] for i in selected_indices]
     if cherry_pick and branch:
         _cherry_pick_commits(cherry_pick, branch, parent_dir, auto_resolve)
 
@@ -113,29 +242,29 @@ def cherry_pick(ctx, cherry_pick, branch, auto_resolve, interactive):
 @click.argument("command")
 def alias_add(name, command):
     """Add new alias."""
+    config = _load_config()
     name = _sanitize_alias(name)
     if "alias" not in config:
         config["alias"] = {}
     if name in config["alias"]:
         click.echo(f"Alias '{name}' already exists")
         return
-    config["alias"][_sanitize_alias(name)] = command
-    with open(CONFIG_FILE, "w") as config_file:
-        config.write(config_file)
+    config["alias"][name] = command
+    _save_config(config)
     click.echo(f"Alias '{name}' added for command '{command}'")
 
 @cli.command()
 @click.argument("name")
 def alias_remove(name):
     """Remove alias."""
+    config = _load_config()
     if "alias" not in config:
         click.echo(f"Cannot delete '{name}'. No aliases found")
         return
 
     if name in config["alias"]:
         del config["alias"][name]
-        with open(CONFIG_FILE, "w") as configfile:
-            config.write(configfile)
+        _save_config(config)
         click.echo(f"Alias '{name}' removed.")
     else:
         click.echo(f"Alias '{name}' does not exist.")
@@ -143,14 +272,14 @@ def alias_remove(name):
 @cli.command()
 def alias_list():
     """List all defined aliases."""
+    from texttable import Texttable
+    config = _load_config()
     if "alias" in config:
+        aliases = config["alias"]
+        rows = [("Alias", "Command")]
+        rows.extend(aliases.items() if len(aliases) else [("No aliases found", "")])
         t = Texttable()
-        t.add_row(["Alias", "Command"])
-        if config["alias"].__len__() == 0:
-            t.add_row(["No aliases found", ""])
-        else:
-            for alias, command in config["alias"].items():
-                t.add_row([alias, command])
+        t.add_rows(rows)
         click.echo(t.draw())
     else:
         click.echo("No aliases defined.")
@@ -158,9 +287,9 @@ def alias_list():
 @cli.command()
 def alias_clear():
     """Clear all defined aliases."""
+    config = _load_config()
     config["alias"] = {}
-    with open(CONFIG_FILE, "w") as configfile:
-        config.write(configfile)
+    _save_config(config)
     click.echo("All aliases cleared.")
 
 @cli.command()
@@ -168,6 +297,7 @@ def alias_clear():
 @click.argument("args", nargs=-1)
 def run_alias(alias_name, args):
     """Run a command using an alias."""
+    config = _load_config()
     if alias_name in config["alias"]:
         command = config["alias"][alias_name]
         full_command = command.split() + list(args)